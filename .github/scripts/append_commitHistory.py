@@ -7,21 +7,28 @@ from io import StringIO
 from urllib import request, error
 
 CSV_NAME = "commitHistory.csv"
+GIST_ID_RE = re.compile(r"gist\.github\.com/(?:[^/]+/)?([a-f0-9]+)")
+
+# seconds; a stalled socket must not hang the CI job
+API_TIMEOUT = 30
 
 
 def extract_gist_id(gist_url: str) -> str:
-    m = re.search(r"gist\.github\.com/(?:[^/]+/)?([a-f0-9]+)", gist_url.strip())
+    m = GIST_ID_RE.search(gist_url.strip())
     if not m:
         raise ValueError(f"Invalid gist_url format: {gist_url}")
     return m.group(1)
 
 
-def gh_api_request(method: str, url: str, token: str, payload: dict | None = None) -> dict:
+def gh_api_request(method: str, url: str, token: str, payload: dict | None = None, if_match: str = "") -> tuple[dict, str]:
+    # returns (json body, ETag header)
     headers = {
         "Authorization": f"token {token}",
         "Accept": "application/vnd.github+json",
         "User-Agent": "devops-mlops-report",
     }
+    if if_match:
+        headers["If-Match"] = if_match
     data = None
     if payload is not None:
         data = json.dumps(payload).encode("utf-8")
@@ -29,36 +36,48 @@ def gh_api_request(method: str, url: str, token: str, payload: dict | None = Non
 
     req = request.Request(url, data=data, headers=headers, method=method)
     try:
-        with request.urlopen(req) as resp:
+        with request.urlopen(req, timeout=API_TIMEOUT) as resp:
             body = resp.read().decode("utf-8")
-            return json.loads(body) if body else {}
+            return (json.loads(body) if body else {}), (resp.headers.get("ETag") or "")
     except error.HTTPError as e:
         detail = e.read().decode("utf-8", errors="ignore")
         raise RuntimeError(f"GitHub API error {e.code} {e.reason}: {detail}") from e
 
 
-def get_gist_file_content(gist_id: str, token: str, filename: str) -> str | None:
-    gist = gh_api_request("GET", f"https://api.github.com/gists/{gist_id}", token)
+def get_gist_file_content(gist_id: str, token: str, filename: str) -> tuple[str | None, str]:
+    gist, etag = gh_api_request("GET", f"https://api.github.com/gists/{gist_id}", token)
     files = gist.get("files", {})
     if filename not in files:
-        return None
-    return files[filename].get("content")
+        return None, etag
+    return files[filename].get("content"), etag
 
 
-def update_gist_file(gist_id: str, token: str, filename: str, content: str) -> None:
+def update_gist_file(gist_id: str, token: str, filename: str, content: str, etag: str = "") -> None:
+    # If-Match needs a strong validator; a weak one (W/"...") can never match
+    if_match = etag if etag and not etag.startswith("W/") else ""
     payload = {"files": {filename: {"content": content}}}
-    gh_api_request("PATCH", f"https://api.github.com/gists/{gist_id}", token, payload)
+    gh_api_request("PATCH", f"https://api.github.com/gists/{gist_id}", token, payload, if_match=if_match)
 
 
 def append_csv_row(existing_csv: str | None, row: dict, fieldnames: list[str]) -> str:
     buf = StringIO()
     writer = csv.DictWriter(buf, fieldnames=fieldnames)
-    writer.writeheader()
 
-    if existing_csv and existing_csv.strip():
-        reader = csv.DictReader(StringIO(existing_csv))
-        for r in reader:
-            writer.writerow({k: r.get(k, "") for k in fieldnames})
+    existing_csv = existing_csv or ""
+    header = next(csv.reader(StringIO(existing_csv)), []) if existing_csv.strip() else []
+
+    if header == fieldnames:
+        # same schema: keep existing rows verbatim, only the new row is encoded
+        buf.write(existing_csv)
+        if not existing_csv.endswith(("\n", "\r")):
+            buf.write("\r\n")
+    else:
+        # new file or changed columns: rewrite existing rows onto the new header
+        writer.writeheader()
+        if existing_csv.strip():
+            reader = csv.DictReader(StringIO(existing_csv))
+            for r in reader:
+                writer.writerow({k: r.get(k, "") for k in fieldnames})
 
     writer.writerow({k: row.get(k, "") for k in fieldnames})
     return buf.getvalue()
@@ -68,6 +87,7 @@ def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--gist-url", required=True)
     ap.add_argument("--row-json", required=True)
+    ap.add_argument("--out-csv", default="", help="also write the updated CSV here (read by later steps)")
     args = ap.parse_args()
 
     token = os.environ.get("GIST_TOKEN", "").strip()
@@ -82,9 +102,22 @@ def main():
     fieldnames = payload["fieldnames"]
     row = payload["row"]
 
-    existing = get_gist_file_content(gist_id, token, CSV_NAME)
-    updated = append_csv_row(existing, row, fieldnames)
-    update_gist_file(gist_id, token, CSV_NAME, updated)
+    # optimistic concurrency: PATCH only if the gist is unchanged since our GET;
+    # on 412 another run appended in between, so re-read and retry once
+    for attempt in range(2):
+        existing, etag = get_gist_file_content(gist_id, token, CSV_NAME)
+        updated = append_csv_row(existing, row, fieldnames)
+        try:
+            update_gist_file(gist_id, token, CSV_NAME, updated, etag)
+            break
+        except RuntimeError as e:
+            if attempt or " 412 " not in str(e):
+                raise
+
+    if args.out_csv:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out_csv)), exist_ok=True)
+        with open(args.out_csv, "w", encoding="utf-8", newline="") as f:
+            f.write(updated)
 
     print(f"Updated {CSV_NAME} in gist: {args.gist_url}")
 
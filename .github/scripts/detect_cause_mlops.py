@@ -1,10 +1,19 @@
 import argparse
+import functools
 import json
 import os
 import re
 import subprocess
 
-import yaml
+try:
+    import orjson  # type: ignore
+except Exception:  # optional: stdlib json is the fallback
+    orjson = None
+
+PY_CMD_RE = re.compile(r"\bpython(?:3)?\s+([^\s]+\.py)\b")
+
+# repo-name prefixes stripped by normalize_repo_rel_path (filled in main)
+REPO_HINTS: frozenset[str] = frozenset()
 
 
 def path_exists(p: str) -> bool:
@@ -14,26 +23,59 @@ def path_exists(p: str) -> bool:
         return False
 
 
-def run_git(cwd: str, args: list[str]) -> str:
-    out = subprocess.check_output(["git", *args], cwd=cwd, stderr=subprocess.STDOUT)
-    return out.decode("utf-8", errors="ignore").strip()
+def load_json_file(path: str):
+    with open(path, "rb") as f:
+        data = f.read()
+    if orjson:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # stricter than json (e.g. NaN/Infinity literals): let json decide
+    return json.loads(data)
+
+
+def dump_json_file(path: str, obj) -> None:
+    if orjson:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(obj, f, indent=2)
+
 
+def run_git(cwd: str, args: list[str]) -> bytes:
+    # raw stdout only: stderr noise would corrupt NUL-separated (-z) output
+    return subprocess.check_output(["git", *args], cwd=cwd, stderr=subprocess.DEVNULL)
 
-def get_changed_files_single_commit(repo_dir: str, sha: str) -> list[str]:
-     if not sha:
-        return []
-     try:
-         txt = run_git(repo_dir, ["show", "--name-only", "--pretty=format:", sha])
-         files = [f.strip() for f in txt.splitlines() if f.strip()]
-         return files
-     except Exception:
-         return []
+
+def get_commit_subject_and_files(repo_dir: str, sha: str) -> tuple[str, list[str]]:
+    """
+    One `git show` for both the commit subject and the changed files
+    (run_report.py reuses the subject instead of forking git again).
+    """
+    if not sha:
+        return "", []
+    try:
+        out = run_git(repo_dir, ["show", "-z", "--name-only", "--pretty=format:%s%x1f", sha])
+    except Exception:
+        return "", []
+    # "<subject>\x1f\n<file>\0<file>\0..." -- names are unquoted and kept as-is
+    subject, _, rest = out.partition(b"\x1f")
+    if rest.startswith(b"\n"):
+        rest = rest[1:]
+    files = [f.decode("utf-8", errors="ignore") for f in rest.split(b"\x00") if f]
+    return subject.decode("utf-8", errors="ignore").strip(), files
 
 
 def parse_mlproject_for_script(mlproject_path: str) -> str | None:
+    # deferred: repos without an MLproject never pay for the yaml import
+    import yaml
+
+    # libyaml-backed loader when PyYAML was built with it (same semantics as safe_load)
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     try:
         with open(mlproject_path, "r", encoding="utf-8") as f:
-            obj = yaml.safe_load(f) or {}
+            obj = yaml.load(f, Loader=loader) or {}
     except Exception:
         return None
 
@@ -42,36 +84,19 @@ def parse_mlproject_for_script(mlproject_path: str) -> str | None:
         cmd = ep.get("command") if isinstance(ep, dict) else None
         if not cmd or not isinstance(cmd, str):
             continue
-        m = re.search(r"\bpython(?:3)?\s+([^\s]+\.py)\b", cmd)
+        m = PY_CMD_RE.search(cmd)
         if m:
             return m.group(1)
     return None
 
 
-def find_strings_ending_with_py(obj) -> list[str]:
-    hits: list[str] = []
-    if isinstance(obj, dict):
-        for v in obj.values():
-            hits.extend(find_strings_ending_with_py(v))
-    elif isinstance(obj, list):
-        for v in obj:
-            hits.extend(find_strings_ending_with_py(v))
-    elif isinstance(obj, str):
-        if obj.strip().endswith(".py"):
-            hits.append(obj.strip())
-    return hits
-
-
 def parse_pipeline_for_script_and_data(pipeline_path: str) -> tuple[str | None, list[str]]:
     try:
-        with open(pipeline_path, "r", encoding="utf-8") as f:
-            obj = json.load(f)
+        obj = load_json_file(pipeline_path)
     except Exception:
         return None, []
 
-    py_candidates = find_strings_ending_with_py(obj)
-    script = py_candidates[0] if py_candidates else None
-
+    script: str | None = None
     data_paths: set[str] = set()
 
     def normalize_path(p: str) -> str:
@@ -89,24 +114,25 @@ def parse_pipeline_for_script_and_data(pipeline_path: str) -> tuple[str | None,
             return True
         return False
 
-    def walk(o):
+    # single iterative pre-order walk (children pushed reversed so the
+    # first *.py string found is the same one the recursive scan returned)
+    stack: list[tuple[str, object]] = [("", obj)]
+    while stack:
+        key_lower, o = stack.pop()
         if isinstance(o, dict):
-            for k, v in o.items():
-                lk = str(k).lower()
-                if isinstance(v, str) and looks_like_data_path(lk, v):
-                    data_paths.add(normalize_path(v))
-                walk(v)
+            stack.extend((str(k).lower(), v) for k, v in reversed(o.items()))
         elif isinstance(o, list):
-            for v in o:
-                walk(v)
+            stack.extend(("", v) for v in reversed(o))
         elif isinstance(o, str):
-            if looks_like_data_path("", o):
+            if script is None and o.strip().endswith(".py"):
+                script = o.strip()
+            if looks_like_data_path(key_lower, o):
                 data_paths.add(normalize_path(o))
 
-    walk(obj)
     return script, sorted(data_paths)
 
-def normalize_repo_rel_path(p: str, repo_hints: set[str] | None = None) -> str:
+@functools.lru_cache(maxsize=4096)
+def normalize_repo_rel_path(p: str, repo_hints: frozenset[str] | None = None) -> str:
     """
     Normalize to repo-relative paths (like git changed files).
     Handles:
@@ -148,14 +174,20 @@ def classify_cause(changed_files: list[str], script_path: str | None, data_paths
     # normalize data paths once
     norm_data_paths = [normalize_repo_rel_path(dp, REPO_HINTS).rstrip("/") for dp in (data_paths or []) if dp]
 
+    # startswith(tuple) / set membership run in C instead of any() per file
+    script_prefix_tuple = tuple(script_prefixes)
+    data_exact = frozenset(dp for dp in norm_data_paths if dp)
+    data_prefixes = tuple(dp + "/" for dp in data_exact)
+
     for f in changed:
-        if any(f == p or f.startswith(p) for p in script_prefixes):
+        if not script_hit and f.startswith(script_prefix_tuple):
             script_hit = True
 
-        if any(f == dp or f.startswith(dp + "/") for dp in norm_data_paths if dp):
+        if not data_hit and (f in data_exact or f.startswith(data_prefixes)):
             data_hit = True
 
-
+        if script_hit and data_hit:
+            break
 
     if script_hit and data_hit:
         cause = "Both"
@@ -190,17 +222,30 @@ def main():
     arg2pipeline_dir = os.path.join(caller_root, "arg2pipeline")
     pipeline_json = os.path.join(arg2pipeline_dir, "pipeline.json")
 
-    mlflow_project_detected = path_exists(mlproject) and os.path.isdir(arg2pipeline_dir)
+    # one directory read of the repo root instead of a stat() per check
+    try:
+        with os.scandir(caller_root) as it:
+            root_entries = {e.name: e for e in it}
+    except OSError:
+        root_entries = {}
+
+    mlproject_entry = root_entries.get("MLproject")
+    arg2pipeline_entry = root_entries.get("arg2pipeline")
+    has_mlproject = mlproject_entry is not None and mlproject_entry.is_file()
+    has_arg2pipeline = arg2pipeline_entry is not None and arg2pipeline_entry.is_dir()
+    has_pipeline_json = has_arg2pipeline and path_exists(pipeline_json)
+
+    mlflow_project_detected = has_mlproject and has_arg2pipeline
 
     missing_reason = ""
-    if not path_exists(mlproject):
+    if not has_mlproject:
         missing_reason = "MLproject file not found at repo root."
-    elif not os.path.isdir(arg2pipeline_dir):
+    elif not has_arg2pipeline:
         missing_reason = "arg2pipeline/ directory not found."
-    elif not path_exists(pipeline_json):
+    elif not has_pipeline_json:
         missing_reason = "arg2pipeline/ found, but pipeline.json is missing (limited parsing)."
 
-    changed_files = get_changed_files_single_commit(caller_root, sha) if sha else []
+    commit_msg, changed_files = get_commit_subject_and_files(caller_root, sha)
     
     cause = ""
     dbg = {
@@ -212,27 +257,30 @@ def main():
     }
 
     global REPO_HINTS
-    REPO_HINTS = set()
+    hints: set[str] = set()
 
     # hint from GitHub context (caller repo name)
     repo_full = os.getenv("GITHUB_REPOSITORY", "")  # like "cyndi-s/mlops-ci-demo"
     if repo_full and "/" in repo_full:
-        REPO_HINTS.add(repo_full.split("/")[-1])
+        hints.add(repo_full.split("/")[-1])
 
     # hint from MLproject name if you already parse it (add if you have it)
     # example variable name: project_name
     try:
         if project_name:
-            REPO_HINTS.add(project_name)
+            hints.add(project_name)
     except Exception:
         pass
 
+    # frozen so normalize_repo_rel_path can be memoized on (path, hints)
+    REPO_HINTS = frozenset(hints)
+
 
     if mlflow_project_detected:
         script_from_mlproject = parse_mlproject_for_script(mlproject)
 
         script_from_pipeline, data_paths = (None, [])
-        if path_exists(pipeline_json):
+        if has_pipeline_json:
             script_from_pipeline, data_paths = parse_pipeline_for_script_and_data(pipeline_json)
 
         script_path = script_from_mlproject or script_from_pipeline
@@ -241,14 +289,14 @@ def main():
     payload = {
         "mlflow_project_detected": mlflow_project_detected,
         "missing_reason": missing_reason,
+        "commit_msg": commit_msg,
         "changed_files": changed_files,  # kept for debugging / future use
         "cause": cause,
         "dbg": dbg,
     }
 
     os.makedirs(os.path.dirname(args.out), exist_ok=True)
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2)
+    dump_json_file(args.out, payload)
 
 
 if __name__ == "__main__":
@@ -14,11 +14,7 @@ def load_cfg(path: str) -> dict:
 
 def kv_string(d: Dict[str, Any]) -> str:
     # stable, readable "k=v; k2=v2"
-    items = []
-    for k in sorted(d.keys()):
-        v = d[k]
-        items.append(f"{k}={v}")
-    return "; ".join(items)
+    return "; ".join(f"{k}={d[k]}" for k in sorted(d))
 
 def format_duration_ms(ms: int | None) -> str:
     if not ms or ms <= 0:
@@ -56,34 +52,38 @@ def main() -> int:
         "reason": "",
     }
 
-    try:
-        import mlflow  # type: ignore
-        from mlflow.tracking import MlflowClient  # type: ignore
-
-        if tracking_uri:
-            mlflow.set_tracking_uri(tracking_uri)
-
-        client = MlflowClient()
-        run = client.get_run(args.run_id)
-        info = run.info
-
-        duration_ms = None
-        if info.start_time and info.end_time:
-            duration_ms = info.end_time - info.start_time
-        duration_str = format_duration_ms(duration_ms)
-
-
-        payload["experiment_id"] = run.info.experiment_id
-        payload["params"] = dict(run.data.params or {})
-        payload["metrics"] = dict(run.data.metrics or {})
-
-        payload["params_kv"] = kv_string(payload["params"])
-        payload["metrics_kv"] = kv_string(payload["metrics"])
-        payload["duration"] = duration_str 
-        payload["reason"] = "ok"
-
-    except Exception as e:
-        payload["reason"] = f"failed: {type(e).__name__}: {e}"
+    if not args.run_id.strip():
+        # no run to describe: skip the mlflow import and tracking-server call
+        payload["reason"] = "skipped: empty run_id"
+    else:
+        try:
+            from mlflow.tracking import MlflowClient  # type: ignore
+
+            # explicit URI on the client; no global mlflow.set_tracking_uri needed
+            client = MlflowClient(tracking_uri=tracking_uri or None)
+            run = client.get_run(args.run_id)
+            info = run.info
+
+            duration_ms = None
+            if info.start_time and info.end_time:
+                duration_ms = info.end_time - info.start_time
+            duration_str = format_duration_ms(duration_ms)
+
+
+            payload["experiment_id"] = run.info.experiment_id
+            # RunData already hands out plain dicts; only read here, so no copy
+            params = run.data.params or {}
+            metrics = run.data.metrics or {}
+            payload["params"] = params
+            payload["metrics"] = metrics
+
+            payload["params_kv"] = kv_string(params)
+            payload["metrics_kv"] = kv_string(metrics)
+            payload["duration"] = duration_str 
+            payload["reason"] = "ok"
+
+        except Exception as e:
+            payload["reason"] = f"failed: {type(e).__name__}: {e}"
 
     os.makedirs(os.path.dirname(args.out), exist_ok=True)
     with open(args.out, "w", encoding="utf-8") as f:
@@ -4,13 +4,16 @@ import json
 import os
 import re
 from io import StringIO
-from typing import Dict, List, Optional
+from typing import List, Optional
 from urllib import request, error
 
 import yaml
 
 
 CSV_NAME_DEFAULT = "commitHistory.csv"
+GIST_ID_RE = re.compile(r"gist\.github\.com/(?:[^/]+/)?([a-f0-9]+)")
+# MLflow run ids are uuid hex; anything with quotes/spaces cannot match a filter
+RUN_ID_RE = re.compile(r"[A-Za-z0-9_-]+")
 
 
 def load_cfg(path: str) -> dict:
@@ -19,7 +22,7 @@ def load_cfg(path: str) -> dict:
 
 
 def extract_gist_id(gist_url: str) -> str:
-    m = re.search(r"gist\.github\.com/(?:[^/]+/)?([a-f0-9]+)", gist_url.strip())
+    m = GIST_ID_RE.search(gist_url.strip())
     if not m:
         raise ValueError(f"Invalid gist_url format: {gist_url}")
     return m.group(1)
@@ -58,6 +61,39 @@ def is_true(v: str) -> bool:
     return (v or "").strip().lower() in ("yes", "true", "1")
 
 
+def latest_trained_run_id(csv_text: str) -> str:
+    """
+    run_id of the newest (by timestamp_local, later row on ties) trained row
+    that has one. Single csv.reader pass: no per-row dicts, no sort.
+    """
+    rdr = csv.reader(StringIO(csv_text))
+    header = next(rdr, None)
+    if not header:
+        return ""
+    idx = {h.strip(): i for i, h in enumerate(header)}
+    ts_i = idx.get("timestamp_local")
+    trained_i = idx.get("is_trained")
+    rid_i = idx.get("mlflow_run_id")
+    if trained_i is None or rid_i is None:
+        return ""
+
+    def cell(row: List[str], i: Optional[int]) -> str:
+        return row[i].strip() if i is not None and i < len(row) else ""
+
+    best_ts: Optional[str] = None
+    best_rid = ""
+    for row in rdr:
+        if not is_true(cell(row, trained_i)):
+            continue
+        rid = cell(row, rid_i)
+        if not rid:
+            continue
+        ts = cell(row, ts_i)
+        if best_ts is None or ts >= best_ts:
+            best_ts, best_rid = ts, rid
+    return best_rid
+
+
 def try_import_mlflow():
     try:
         import mlflow  # type: ignore
@@ -89,6 +125,7 @@ def main() -> int:
     ap.add_argument("--config", required=True, help="caller report-config.yml path")
     ap.add_argument("--gist-url", required=True, help="gist url")
     ap.add_argument("--csv-name", default=CSV_NAME_DEFAULT)
+    ap.add_argument("--local-csv", default="", help="local commitHistory.csv path")
     ap.add_argument("--out", required=True, help="output json path")
     args = ap.parse_args()
 
@@ -100,30 +137,22 @@ def main() -> int:
     tracking_uri = ((cfg.get("mlflow") or {}).get("tracking_uri") or "").strip()
 
     gist_id = extract_gist_id(args.gist_url)
-    csv_text = get_gist_file_content(gist_id, token, args.csv_name) or ""
-
-    rows: List[Dict[str, str]] = []
-    if csv_text.strip():
-        rdr = csv.DictReader(StringIO(csv_text))
-        for r in rdr:
-            rows.append({k: (v or "").strip() for k, v in r.items()})
-
-    # find latest trained run_id
-    rows.sort(key=lambda r: r.get("timestamp_local", ""))
-    run_id = ""
-    for r in reversed(rows):
-        if is_true(r.get("is_trained", "")):
-            run_id = (r.get("mlflow_run_id") or "").strip()
-            if run_id:
-                break
+    if args.local_csv and os.path.exists(args.local_csv):
+        with open(args.local_csv, "r", encoding="utf-8", newline="") as f:
+            csv_text = f.read()
+    else:
+        csv_text = get_gist_file_content(gist_id, token, args.csv_name) or ""
+
+    run_id = latest_trained_run_id(csv_text)
 
     model_version = ""
 
-    mlflow, MlflowClient = try_import_mlflow()
-    if mlflow and MlflowClient and tracking_uri and run_id:
+    # import mlflow only when there is something (well-formed) to look up
+    lookup = bool(tracking_uri and run_id and RUN_ID_RE.fullmatch(run_id))
+    mlflow, MlflowClient = try_import_mlflow() if lookup else (None, None)
+    if mlflow and MlflowClient:
         try:
-            mlflow.set_tracking_uri(tracking_uri)
-            client = MlflowClient()
+            client = MlflowClient(tracking_uri=tracking_uri)
             model_version = best_model_version_for_run(client, run_id)
         except Exception:
             model_version = ""
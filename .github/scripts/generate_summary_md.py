@@ -1,19 +1,53 @@
 import argparse
 import csv
-import html
 import json
 import os
 import re
-import subprocess
 from datetime import datetime, timezone
 from io import StringIO
-from typing import Any, Dict, List, Optional
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional
 from urllib import request, error
-from zoneinfo import ZoneInfo
 
 import yaml
 
 CSV_NAME_DEFAULT = "commitHistory.csv"
+GIST_ID_RE = re.compile(r"gist\.github\.com/(?:[^/]+/)?([a-f0-9]+)")
+
+# same mapping as html.escape(quote=True), applied in one C-level pass
+HTML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"})
+
+# centered table cell shared by Sections 1 and 2; Section 2 rows have 9 cells
+CELL_TPL = "<td style='text-align:center; vertical-align:middle; word-break:break-word; max-width:100%'>{}</td>"
+TREND_ROW_TPL = "<tr>" + CELL_TPL * 9 + "</tr>"
+TREND_ROW_SHARP_TPL = "<tr>" + CELL_TPL.format("<strong><ins>{}</ins></strong>") * 9 + "</tr>"
+# static table heads; only the (escaped) metric name varies
+S1_HEAD_TPL = (
+    "<table style='width:100%; text-align:center;'>"
+    "<thead><tr>"
+    "<th>Timestamp<br>(Toronto)</th>"
+    "<th>model_version</th>"
+    "<th>Cause</th>"
+    "<th>Parameters</th>"
+    "<th>Metrics</th>"
+    "<th>Δ{metric}</th>"
+    "<th>Duration</th>"
+    "</tr></thead><tbody><tr>"
+)
+S2_HEAD_TPL = (
+    "<table style='width:100%; table-layout:auto; border-collapse:collapse;'>"
+    "<thead><tr>"
+    "<th>#</th>"
+    "<th>Timestamp</th>"
+    "<th>Branch</th>"
+    "<th>Author</th>"
+    "<th>Cause</th>"
+    "<th>{metric}</th>"
+    "<th>Δ{metric}</th>"
+    "<th>Duration</th>"
+    "<th>Commit</th>"
+    "</tr></thead><tbody>"
+)
 FIXED_MLFLOW_MISSING_MSG_MD = """
 **MLflow project not detected**
 
@@ -28,16 +62,9 @@ After adding `MLproject` file and `arg2pipeline/` folder at the repository root,
 """.strip()
 
 
-def get_tz(cfg: dict):
-    name = str(cfg.get("timezone") or "").strip()
-    if not name:
-        return None, ""
-    if name.upper() == "UTC":
-        name = "UTC"
-    try:
-        return ZoneInfo(name), ""
-    except Exception:
-        return None, f"Invalid timezone '{name}'. Falling back to runner timezone."
+def load_json_file(path: str):
+    with open(path, "rb") as f:
+        return json.loads(f.read())
 
 
 def load_cfg(path: str) -> dict:
@@ -46,7 +73,7 @@ def load_cfg(path: str) -> dict:
 
 
 def extract_gist_id(gist_url: str) -> str:
-    m = re.search(r"gist\.github\.com/(?:[^/]+/)?([a-f0-9]+)", gist_url.strip())
+    m = GIST_ID_RE.search(gist_url.strip())
     if not m:
         raise ValueError(f"Invalid gist_url format: {gist_url}")
     return m.group(1)
@@ -80,6 +107,14 @@ def get_gist_file_content(gist_id: str, token: str, filename: str) -> str | None
     return files[filename].get("content")
 
 
+def esc(s: str) -> str:
+    return s.translate(HTML_ESCAPE)
+
+
+def read_csv_rows(f: Iterable[str]) -> List[Dict[str, str]]:
+    return [{k: (v or "").strip() for k, v in (r or {}).items()} for r in csv.DictReader(f)]
+
+
 def is_true(v: str) -> bool:
     return (v or "").strip().lower() in ("yes", "true", "1")
 
@@ -89,9 +124,9 @@ def parse_kv(s: str) -> Dict[str, str]:
     s = (s or "").strip()
     if not s:
         return out
-    for p in [x.strip() for x in s.split(";") if x.strip()]:
-        if "=" in p:
-            k, v = p.split("=", 1)
+    for p in s.split(";"):
+        k, sep, v = p.partition("=")
+        if sep:
             out[k.strip()] = v.strip()
     return out
 
@@ -106,11 +141,17 @@ def safe_float(x: Any) -> Optional[float]:
 
 
 def fmt_val(x: Any) -> str:
-    try:
-        fx = float(x)
-        return f"{fx:.3f}" if abs(fx) >= 1e-3 or fx == 0 else f"{fx:.1e}"
-    except Exception:
-        return "" if x in (None, "") else str(x)
+    # trend values are already floats; only kv strings need parsing
+    if isinstance(x, float):
+        fx = x
+    elif x is None or x == "":
+        return ""
+    else:
+        try:
+            fx = float(x)
+        except (TypeError, ValueError):
+            return str(x)
+    return f"{fx:.3f}" if abs(fx) >= 1e-3 or fx == 0 else f"{fx:.1e}"
 
 def fmt_kv_3dp(s: str) -> str:
     """
@@ -120,16 +161,16 @@ def fmt_kv_3dp(s: str) -> str:
     s = (s or "").strip()
     if not s:
         return ""
-    parts = [p.strip() for p in s.split(";") if p.strip()]
     out_parts: List[str] = []
-    for p in parts:
-        if "=" not in p:
+    for p in s.split(";"):
+        p = p.strip()
+        if not p:
+            continue
+        k, sep, v = p.partition("=")
+        if not sep:
             out_parts.append(p)
             continue
-        k, v = p.split("=", 1)
-        k = k.strip()
-        v = v.strip()
-        out_parts.append(f"{k}={fmt_val(v)}")
+        out_parts.append(f"{k.strip()}={fmt_val(v.strip())}")
     return "; ".join(out_parts)
 
 def fmt_bytes(n: int) -> str:
@@ -158,13 +199,6 @@ def arrow_delta(prev: Any, cur: Any) -> str:
     return f"{arrow} {mag_s}"
 
 
-def sh(args: List[str]) -> str:
-    try:
-        return subprocess.check_output(args, text=True).strip()
-    except Exception:
-        return ""
-
-
 def write_summary(md: str) -> None:
     out = os.environ.get("GITHUB_STEP_SUMMARY") or ""
     if not out:
@@ -178,6 +212,7 @@ def main() -> int:
     ap.add_argument("--config", required=True)
     ap.add_argument("--gist-url", required=True)
     ap.add_argument("--csv-name", default=CSV_NAME_DEFAULT)
+    ap.add_argument("--local-csv", default="")
     ap.add_argument("--svg-json", required=True)
     ap.add_argument("--model-json", required=True)
     ap.add_argument("--devops-json", required=True)
@@ -189,7 +224,6 @@ def main() -> int:
         raise SystemExit("Missing env GIST_TOKEN")
 
     cfg = load_cfg(args.config)
-    tz, tz_warn = get_tz(cfg)
     report = cfg.get("report") or {}
     metric = str(report.get("highlight_metric") or "").strip()
     sharp_delta = float(report.get("sharp_delta") or 0.15)
@@ -199,64 +233,59 @@ def main() -> int:
         raise SystemExit("Missing report.highlight_metric in config")
 
     gist_id = extract_gist_id(args.gist_url)
-    csv_text = get_gist_file_content(gist_id, token, args.csv_name) or ""
-    rows: List[Dict[str, str]] = []
-    if csv_text.strip():
-        rdr = csv.DictReader(StringIO(csv_text))
-        for r in rdr:
-            rows.append({k: (v or "").strip() for k, v in (r or {}).items()})
-
-    rows.sort(key=lambda r: r.get("timestamp_local", ""))
-
-    trained_rows_all = [r for r in rows if is_true(r.get("is_trained", ""))]
-
-    # DEDUPE by commit_sha: keep latest row per commit
-    seen = set()
-    trained_rows = []
-    for r in reversed(trained_rows_all):
-        sha_i = (r.get("commit_sha") or "").strip()
-        if sha_i and sha_i in seen:
-            continue
-        if sha_i:
-            seen.add(sha_i)
-        trained_rows.append(r)
-    trained_rows.reverse()
+    if args.local_csv and os.path.exists(args.local_csv):
+        # stream the local copy straight into the reader; no full-text buffer
+        with open(args.local_csv, "r", encoding="utf-8", newline="") as f:
+            rows = read_csv_rows(f)
+    else:
+        csv_text = get_gist_file_content(gist_id, token, args.csv_name) or ""
+        rows = read_csv_rows(StringIO(csv_text)) if csv_text.strip() else []
 
-    latest = trained_rows[-1] if trained_rows else None
-    prev = trained_rows[-2] if len(trained_rows) >= 2 else None
+    if rows and "timestamp_local" in rows[0]:
+        rows.sort(key=itemgetter("timestamp_local"))
 
     # ---- Ground truth: trained_this_run (Phase 2.4 rule) ----
     # Prefer an explicit env flag if run_report.py sets it; fallback to CSV row with this commit and a non-empty run_id.
     trained_this_run = (os.environ.get("TRAINED_THIS_RUN") or "").strip().lower() == "true"
     sha = (os.environ.get("GITHUB_SHA") or "").strip()
-    if not trained_this_run and sha:
-        for r in reversed(rows):
-            if (r.get("commit_sha") or "").strip() == sha:
-                trained_this_run = is_true(r.get("is_trained", ""))
-                break
-    
-    # ---- Does CSV contain ANY model signal? ----
-    # (Used to decide whether to show Section 1 badge + Section 3 Model source)
-    def row_has_model_signal(r: Dict[str, str]) -> bool:
-        return bool(
-            (r.get("mlflow_run_id") or "").strip()
-            or (r.get("model_version") or "").strip()
-        )
 
-    has_any_model_info = trained_this_run or any(row_has_model_signal(r) for r in rows)
+    # one pass over the sorted rows: trained subset, last row for this commit,
+    # and whether the CSV carries ANY model signal (run_id / model_version)
+    # DEDUPE by commit_sha: keep latest row per commit; pop + re-insert moves it
+    # to the slot of that latest row (rows without a sha are all kept via id())
+    trained_by_sha: Dict[Any, Dict[str, str]] = {}
+    sha_row = None
+    any_model_signal = False
+    for r in rows:
+        if is_true(r.get("is_trained", "")):
+            key = r.get("commit_sha") or id(r)
+            trained_by_sha.pop(key, None)
+            trained_by_sha[key] = r
+        if sha and r.get("commit_sha") == sha:
+            sha_row = r
+        if not any_model_signal and (r.get("mlflow_run_id") or r.get("model_version")):
+            any_model_signal = True
+
+    trained_rows = list(trained_by_sha.values())
+
+    latest = trained_rows[-1] if trained_rows else None
+    prev = trained_rows[-2] if len(trained_rows) >= 2 else None
+
+    if not trained_this_run and sha_row is not None:
+        trained_this_run = is_true(sha_row.get("is_trained", ""))
+
+    # (Used to decide whether to show Section 1 badge + Section 3 Model source)
+    has_any_model_info = trained_this_run or any_model_signal
 
 
     # ---- SVG/model json ----
-    with open(args.svg_json, "r", encoding="utf-8") as f:
-        svgj = json.load(f) or {}
+    svgj = load_json_file(args.svg_json) or {}
     svg_url = (svgj.get("svg_url") or "").strip()
 
-    with open(args.model_json, "r", encoding="utf-8") as f:
-        mj = json.load(f) or {}
+    mj = load_json_file(args.model_json) or {}
     model_version = (mj.get("model_version") or "").strip()
 
-    with open(args.devops_json, "r", encoding="utf-8") as f:
-        dev = json.load(f) or {}
+    dev = load_json_file(args.devops_json) or {}
     mlflow_project_detected = str(dev.get("mlflow_project_detected", "")).lower() in ("yes", "true", "1")
     # status from devops_json (fallback to env, then "Unknown")
     workflow_status = (dev.get("status") or dev.get("workflow_status") or "").strip()
@@ -265,15 +294,24 @@ def main() -> int:
     if not workflow_status:
         workflow_status = "Unknown"
 
-    with open(args.artifacts_json, "r", encoding="utf-8") as f:
-        aj = json.load(f) or {}
+    aj = load_json_file(args.artifacts_json) or {}
     run_url = (aj.get("run_url") or "").strip()
     artifact_items = aj.get("items") or []
 
     # ---- helpers ----
+    # latest/prev are also trend rows, and duration falls back to the same kv;
+    # parse each distinct metrics string once
+    metrics_cache: Dict[str, Dict[str, str]] = {}
+
+    def row_metrics(r: Dict[str, str]) -> Dict[str, str]:
+        s = r.get("mlflow_metrics_kv", "")
+        m = metrics_cache.get(s)
+        if m is None:
+            m = metrics_cache[s] = parse_kv(s)
+        return m
+
     def metric_from_row(r: Dict[str, str], key: str) -> Optional[float]:
-        m = parse_kv(r.get("mlflow_metrics_kv", ""))
-        return safe_float(m.get(key))
+        return safe_float(row_metrics(r).get(key))
 
     def duration_str(r: Dict[str, str]) -> str:
         # preferred: dedicated string column from MLflow ("12s", "3m 12s")
@@ -284,8 +322,7 @@ def main() -> int:
         # fallback: old numeric minutes column if it exists
         dm = safe_float(r.get("duration_min"))
         if dm is None:
-            m = parse_kv(r.get("mlflow_metrics_kv", ""))
-            dm = safe_float(m.get("duration_min"))
+            dm = safe_float(row_metrics(r).get("duration_min"))
 
         if dm is None:
             return ""
@@ -299,7 +336,7 @@ def main() -> int:
 
     # ---- Section 1 data ----
     badge_txt = "from this workflow run" if trained_this_run else "from a previous run"
-    badge = f"<strong><ins><code>{html.escape(badge_txt)}</code></ins></strong>"
+    badge = f"<strong><ins><code>{esc(badge_txt)}</code></ins></strong>"
 
     s1_ts = (latest.get("timestamp_local") if latest else "") or ""
     s1_cause = (latest.get("cause") if latest else "") or ""
@@ -339,12 +376,14 @@ def main() -> int:
     repo = (os.environ.get("GITHUB_REPOSITORY") or "").strip()
     server = (os.environ.get("GITHUB_SERVER_URL") or "https://github.com").strip()
 
+    commit_prefix = f"{server}/{repo}/commit/" if repo else ""
+
     def commit_link(sha_full: str) -> str:
         short = (sha_full or "")[:7]
-        if repo and sha_full:
-            url = f"{server}/{repo}/commit/{sha_full}"
-            return f'<a href="{html.escape(url)}"><code>{html.escape(short)}</code></a>'
-        return f"<code>{html.escape(short)}</code>"
+        if commit_prefix and sha_full:
+            url = commit_prefix + sha_full
+            return f'<a href="{esc(url)}"><code>{esc(short)}</code></a>'
+        return f"<code>{esc(short)}</code>"
 
     # ---- Section 3 (use caller devops_json to avoid callee mixups) ----
     branch = (dev.get("branch") or "").strip()
@@ -361,6 +400,7 @@ def main() -> int:
 
 
     # ---- Write summary ----
+    metric_esc = esc(metric)
     md: List[str] = []
     md.append("# Pipeline Summary\n\n")
 
@@ -380,49 +420,28 @@ def main() -> int:
         if not latest:
             md.append("_No trained model found in commitHistory.csv yet._\n\n")
         else:
-            md.append("<table style='width:100%; text-align:center;'>")
-            md.append("<thead><tr>"
-                    "<th>Timestamp<br>(Toronto)</th>"
-                    "<th>model_version</th>"
-                    "<th>Cause</th>"
-                    "<th>Parameters</th>"
-                    "<th>Metrics</th>"
-                    f"<th>Δ{html.escape(metric)}</th>"
-                    "<th>Duration</th>"
-                    "</tr></thead><tbody><tr>")
+            md.append(S1_HEAD_TPL.format(metric=metric_esc))
 
             cells = [
-                html.escape(s1_ts),
-                f"<code>{html.escape(mv_cell)}</code>",
-                f"<code>{html.escape(s1_cause)}</code>",
-                f"<code>{html.escape(s1_params)}</code>",
-                f"<code>{html.escape(s1_metrics)}</code>",
-                f"<code>{html.escape(arrow_delta(prev_h, cur_h))}</code>",
-                html.escape(s1_dur or ""),
+                esc(s1_ts),
+                f"<code>{esc(mv_cell)}</code>",
+                f"<code>{esc(s1_cause)}</code>",
+                f"<code>{esc(s1_params)}</code>",
+                f"<code>{esc(s1_metrics)}</code>",
+                f"<code>{esc(arrow_delta(prev_h, cur_h))}</code>",
+                esc(s1_dur or ""),
             ]
-            for c in cells:
-                md.append(f"<td style='text-align:center; vertical-align:middle; word-break:break-word; max-width:100%'>{c}</td>")
+            md.append("".join(CELL_TPL.format(c) for c in cells))
             md.append("</tr></tbody></table>\n\n")
 
     # Section 2
-    md.append(f"## 2) Model Performance ({html.escape(metric)})\n\n")
+    md.append(f"## 2) Model Performance ({metric_esc})\n\n")
     if svg_url:
-        md.append(f"<img alt='{html.escape(metric)} trend' src='{html.escape(svg_url)}' style='width:100%; height:auto; display:block;'/>\n\n")
+        md.append(f"<img alt='{metric_esc} trend' src='{esc(svg_url)}' style='width:100%; height:auto; display:block;'/>\n\n")
     else:
         md.append("<em>SVG not available (no metric points found).</em>\n\n")
 
-    md.append("<table style='width:100%; table-layout:auto; border-collapse:collapse;'>")
-    md.append("<thead><tr>"
-          "<th>#</th>"
-          "<th>Timestamp</th>"
-          "<th>Branch</th>"
-          "<th>Author</th>"
-          "<th>Cause</th>"
-          f"<th>{html.escape(metric)}</th>"
-          f"<th>Δ{html.escape(metric)}</th>"
-          "<th>Duration</th>"
-          "<th>Commit</th>"
-          "</tr></thead><tbody>")
+    md.append(S2_HEAD_TPL.format(metric=metric_esc))
 
     # Use computed per-step delta; highlight sharp rows only (>= sharp_delta)
     for i, p in enumerate(pts):
@@ -440,44 +459,39 @@ def main() -> int:
 
         row_cells = [
             f"<code>{idx}</code>",
-            html.escape(p["ts"]),
-            f"<code>{html.escape(p['branch'])}</code>",
-            f"<code>{html.escape(p['author'])}</code>",
-            f"<code>{html.escape(p['cause'])}</code>",
-            html.escape(val_txt),
-            html.escape(d_txt),
-            html.escape(p["dur"] or ""),
+            esc(p["ts"]),
+            f"<code>{esc(p['branch'])}</code>",
+            f"<code>{esc(p['author'])}</code>",
+            f"<code>{esc(p['cause'])}</code>",
+            esc(val_txt),
+            esc(d_txt),
+            esc(p["dur"] or ""),
             commit_link(p["sha"]),
         ]
 
-        if is_sharp:
-            row_cells = [f"<strong><ins>{c}</ins></strong>" for c in row_cells]
-
-        md.append("<tr>")
-        for c in row_cells:
-            md.append(f"<td style='text-align:center; vertical-align:middle; word-break:break-word; max-width:100%'>{c}</td>")
-        md.append("</tr>")
+        row_tpl = TREND_ROW_SHARP_TPL if is_sharp else TREND_ROW_TPL
+        md.append(row_tpl.format(*row_cells))
 
     md.append("</tbody></table>\n\n")
 
     # Section 3 (your 6 items)
     md.append("## 3) Code\n\n")
     if branch:
-        md.append(f"- **Branch:** <code>{html.escape(branch)}</code>\n")
+        md.append(f"- **Branch:** <code>{esc(branch)}</code>\n")
     if actor:
-        md.append(f"- **Author:** <code>{html.escape(actor)}</code>\n")
+        md.append(f"- **Author:** <code>{esc(actor)}</code>\n")
     if sha and repo:
-        commit_url = f"{server}/{repo}/commit/{sha}"
-        md.append(f'- **Commit:** <a href="{html.escape(commit_url)}"><code>{html.escape(sha[:7])}</code> — {html.escape(commit_msg)}</a>\n')
+        commit_url = commit_prefix + sha
+        md.append(f'- **Commit:** <a href="{esc(commit_url)}"><code>{esc(sha[:7])}</code> — {esc(commit_msg)}</a>\n')
     if model_source:
-        md.append(f"- **Model source:** {html.escape(model_source)}\n")
-    md.append(f"- **Status:** <code>{html.escape(workflow_status)}</code>\n")
+        md.append(f"- **Model source:** {esc(model_source)}\n")
+    md.append(f"- **Status:** <code>{esc(workflow_status)}</code>\n")
     if finished_at:
-        md.append(f"- **Job finished at:** {html.escape(finished_at)}\n")
+        md.append(f"- **Job finished at:** {esc(finished_at)}\n")
 
 
     md.append("## 4) Commit History\n\n")
-    md.append(f"- **Commit History:** [commitHistory.csv](https://gist.github.com/{html.escape(gist_id)})\n\n")
+    md.append(f"- **Commit History:** [commitHistory.csv](https://gist.github.com/{esc(gist_id)})\n\n")
 
 
     # ---- Section 5: MLflow Artifacts ----
@@ -492,8 +506,8 @@ def main() -> int:
             exp_id = "0"
         run_link = f"{tracking_uri}/#/experiments/{exp_id}/runs/{rid}"
         md.append(
-            f'- MLflow run (tracking UI, {html.escape(src_tag)}): '
-            f'<a href="{html.escape(run_link)}"><code>{html.escape(rid)}</code></a>\n'
+            f'- MLflow run (tracking UI, {esc(src_tag)}): '
+            f'<a href="{esc(run_link)}"><code>{esc(rid)}</code></a>\n'
         )
     else:
         md.append("- MLflow run (tracking UI): Not available (missing tracking_uri or run_id)\n")
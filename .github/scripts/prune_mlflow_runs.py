@@ -1,5 +1,6 @@
 import argparse
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 import yaml
@@ -33,7 +34,9 @@ def main() -> int:
         print("Prune skipped (repo_visibility != private).")
         return 0
 
-    tracking_uri = ((cfg.get("mlflow") or {}).get("tracking_uri") or "").strip()
+    mlflow_cfg = cfg.get("mlflow") or {}
+    tracking_uri = (mlflow_cfg.get("tracking_uri") or "").strip()
+    exp_name = str(mlflow_cfg.get("experiment_name") or "").strip()
     if not tracking_uri:
         print("Prune skipped (missing mlflow.tracking_uri in config).")
         return 0
@@ -46,36 +49,58 @@ def main() -> int:
     # auth comes from env:
     # MLFLOW_TRACKING_USERNAME (non-secret) + MLFLOW_TRACKING_PASSWORD (DAGSHUB_TOKEN)
     try:
-        mlflow.set_tracking_uri(tracking_uri)
-        client = MlflowClient()
-
-        # prune across all experiments, but only delete ONE run total to be safe
-        exps = client.search_experiments()
+        client = MlflowClient(tracking_uri=tracking_uri)
+
+        # prune across all experiments (or only mlflow.experiment_name when configured),
+        # but only delete ONE run total to be safe
+        if exp_name:
+            exp = client.get_experiment_by_name(exp_name)
+            if exp is None:
+                # likely a config typo: say so instead of reporting "nothing to prune"
+                print(f"Prune skipped (experiment '{exp_name}' not found; check mlflow.experiment_name).")
+                return 0
+            exps = [exp]
+        else:
+            exps = client.search_experiments()
         deleted = 0
 
-        for exp in exps:
-            if deleted >= 1:
-                break
-
-            exp_id = exp.experiment_id
-            runs = client.search_runs(
+        def oldest_runs(exp_id: str):
+            # one past the cap is enough to know it is exceeded and which run is oldest
+            return client.search_runs(
                 experiment_ids=[exp_id],
                 order_by=["attributes.start_time ASC"],  # oldest first
-                max_results=1000,
+                max_results=MAX_RUNS_PRIVATE + 1,
             )
 
-            if len(runs) <= MAX_RUNS_PRIVATE:
-                continue
-
-            # delete the oldest run (index 0)
-            oldest = runs[0]
-            rid = oldest.info.run_id
-            try:
-                client.delete_run(rid)
-                deleted += 1
-                print(f"Pruned 1 oldest run in exp {exp_id}: run_id={rid} (count was {len(runs)})")
-            except Exception as e:
-                print(f"Failed to delete run {rid}: {e}")
+        # the searches are independent HTTP calls: overlap them, but consume in
+        # experiment order and stop (cancelling queued searches) after the one delete
+        exp_ids = [exp.experiment_id for exp in exps]
+        with ThreadPoolExecutor(max_workers=min(8, len(exp_ids) or 1)) as ex:
+            futs = [ex.submit(oldest_runs, exp_id) for exp_id in exp_ids]
+            for exp_id, fut in zip(exp_ids, futs):
+                try:
+                    runs = fut.result()
+                except Exception as e:
+                    print(f"Skipping exp {exp_id}: search_runs failed: {e}")
+                    continue
+
+                if len(runs) <= MAX_RUNS_PRIVATE:
+                    continue
+
+                # delete the oldest run (index 0)
+                oldest = runs[0]
+                rid = oldest.info.run_id
+                try:
+                    client.delete_run(rid)
+                    deleted += 1
+                    print(f"Pruned 1 oldest run in exp {exp_id}: run_id={rid} (count was > {MAX_RUNS_PRIVATE})")
+                except Exception as e:
+                    print(f"Failed to delete run {rid}: {e}")
+
+                if deleted >= 1:
+                    for f in futs:
+                        f.cancel()
+                    break
 
         if deleted == 0:
             print("No pruning needed (all experiments <= 90 runs).")
@@ -5,14 +5,15 @@ import os
 import re
 import time
 from io import StringIO
+from operator import itemgetter
 from typing import Any, Dict, List, Optional
 from urllib import request, error
 
 import yaml
-import matplotlib.pyplot as plt
 
 
 CSV_NAME_DEFAULT = "commitHistory.csv"
+GIST_ID_RE = re.compile(r"gist\.github\.com/(?:[^/]+/)?([a-f0-9]+)")
 
 
 def load_cfg(path: str) -> dict:
@@ -21,7 +22,7 @@ def load_cfg(path: str) -> dict:
 
 
 def extract_gist_id(gist_url: str) -> str:
-    m = re.search(r"gist\.github\.com/(?:[^/]+/)?([a-f0-9]+)", gist_url.strip())
+    m = GIST_ID_RE.search(gist_url.strip())
     if not m:
         raise ValueError(f"Invalid gist_url format: {gist_url}")
     return m.group(1)
@@ -56,9 +57,10 @@ def get_gist_file_content(gist_id: str, token: str, filename: str) -> str | None
     return files[filename].get("content")
 
 
-def update_gist_file(gist_id: str, token: str, filename: str, content: str) -> None:
+def update_gist_file(gist_id: str, token: str, filename: str, content: str) -> dict:
+    # returns the updated gist (same shape as a GET)
     payload = {"files": {filename: {"content": content}}}
-    gh_api_request("PATCH", f"https://api.github.com/gists/{gist_id}", token, payload)
+    return gh_api_request("PATCH", f"https://api.github.com/gists/{gist_id}", token, payload)
 
 
 def get_gist_raw_url(gist_id: str, token: str, filename: str) -> str:
@@ -110,6 +112,9 @@ def build_svg(timestamps: List[str], vals: List[float], sharp_flags: List[bool],
     if not vals:
         return "<svg xmlns='http://www.w3.org/2000/svg'></svg>"
 
+    # deferred: matplotlib is the slowest import here and is only needed with points
+    import matplotlib.pyplot as plt
+
     xs = list(range(1, len(vals) + 1))
 
     fig, ax = plt.subplots(figsize=(12, 4.8), dpi=120)
@@ -166,6 +171,7 @@ def main() -> int:
     ap.add_argument("--config", required=True)
     ap.add_argument("--gist-url", required=True)
     ap.add_argument("--csv-name", default=CSV_NAME_DEFAULT)
+    ap.add_argument("--local-csv", default="")
     ap.add_argument("--out", required=True)
     args = ap.parse_args()
 
@@ -183,14 +189,19 @@ def main() -> int:
     window = int(report.get("trend_window") or 10)
 
     gist_id = extract_gist_id(args.gist_url)
-    csv_text = get_gist_file_content(gist_id, token, args.csv_name) or ""
+    if args.local_csv and os.path.exists(args.local_csv):
+        with open(args.local_csv, "r", encoding="utf-8", newline="") as f:
+            csv_text = f.read()
+    else:
+        csv_text = get_gist_file_content(gist_id, token, args.csv_name) or ""
     rows: List[Dict[str, str]] = []
     if csv_text.strip():
         rdr = csv.DictReader(StringIO(csv_text))
         for r in rdr:
             rows.append({k: (v or "").strip() for k, v in (r or {}).items()})
 
-    rows.sort(key=lambda r: r.get("timestamp_local", ""))
+    if rows and "timestamp_local" in rows[0]:
+        rows.sort(key=itemgetter("timestamp_local"))
 
     trained_all = [r for r in rows if is_true(r.get("is_trained", ""))]
 
@@ -232,9 +243,10 @@ def main() -> int:
     svg = build_svg(timestamps, vals, sharp_flags, metric, sharp_delta)
 
     last_err = None
+    patched: dict = {}
     for attempt in range(6):  # ~1+2+4+8+16 sec total wait
         try:
-            update_gist_file(gist_id, token, svg_name, svg)
+            patched = update_gist_file(gist_id, token, svg_name, svg)
             last_err = None
             break
         except RuntimeError as e:
@@ -249,7 +261,10 @@ def main() -> int:
     if last_err is not None:
         raise last_err
 
-    raw_url = get_gist_raw_url(gist_id, token, svg_name)
+    # the PATCH response already lists the new raw_url; GET only if it is missing
+    raw_url = (((patched.get("files") or {}).get(svg_name) or {}).get("raw_url") or "").strip()
+    if not raw_url:
+        raw_url = get_gist_raw_url(gist_id, token, svg_name)
     run_id = (os.environ.get("GITHUB_RUN_ID") or "").strip()
     svg_url = f"{raw_url}?ts={run_id}" if (raw_url and run_id) else raw_url
 
@@ -25,6 +25,15 @@ def sh(cmd: list[str]) -> None:
     subprocess.check_call(cmd)
 
 
+def wait_all(procs: list[subprocess.Popen]) -> None:
+    # reap every child before raising, so a failure never orphans the other
+    for p in procs:
+        p.wait()
+    for p in procs:
+        if p.returncode:
+            raise subprocess.CalledProcessError(p.returncode, p.args)
+
+
 def git_log_subject(repo_dir: str, sha: str) -> str:
     if not sha:
         return ""
@@ -92,7 +101,6 @@ def main():
     server_url = os.environ.get("CALLER_SERVER_URL", "") or os.environ.get("GITHUB_SERVER_URL", "https://github.com")
 
     commit_url = f"{server_url}/{repo}/commit/{sha}" if repo and sha else ""
-    commit_msg = git_log_subject(caller_root, sha)
 
     status = os.environ.get("WORKFLOW_STATUS", "success")
     tz = get_tz(cfg)
@@ -116,6 +124,7 @@ def main():
     svg_json = os.path.join(workdir, "svg.json")
     model_json = os.path.join(workdir, "model.json")
     artifacts_json = os.path.join(workdir, "artifacts.json")
+    history_csv = os.path.join(workdir, "commitHistory.csv")
 
     # 1) Detect MLflow project + cause attribution (tested)
     sh([
@@ -127,6 +136,9 @@ def main():
 
     with open(detect_json, "r", encoding="utf-8") as f:
         det = json.load(f)
+
+    # subject comes from detect's `git show`; only fork git again if it is missing
+    commit_msg = (det.get("commit_msg") or "").strip() or git_log_subject(caller_root, sha)
         
     # Decide whether to trigger training (toggle)
     cause = (det.get("cause") or "").strip()
@@ -192,7 +204,8 @@ def main():
     metrics_kv = ""
     duration = ""
 
-    if is_trained == "true":
+    # nothing to look up without a run_id; skip the subprocess + mlflow import
+    if is_trained == "true" and run_id:
         sh([
             "python", ".github/scripts/extract_mlflow_details.py",
             "--config", args.config,
@@ -238,33 +251,48 @@ def main():
 
     sh(["python", ".github/scripts/append_commitHistory.py",
         "--gist-url", gist_url,
-        "--row-json", row_json])
-
-   # 4) Render trend SVG (CSV -> SVG -> gist)
-    sh(["python", ".github/scripts/render_svg.py",
-        "--config", args.config,
-        "--gist-url", gist_url,
-        "--out", svg_json])
-
-    # 5) Fetch registry model version (best-effort)
-    sh(["python", ".github/scripts/fetch_registry_model.py",
-        "--config", args.config,
-        "--gist-url", gist_url,
-        "--out", model_json])
+        "--row-json", row_json,
+        "--out-csv", history_csv])
+
+    # 4) and 5) are independent (gist PATCH vs MLflow registry lookup) and
+    # both only read the local CSV: run them side by side, and list the
+    # artifacts (5.5) while they work
+    procs = [
+        # 4) Render trend SVG (CSV -> SVG -> gist)
+        subprocess.Popen(["python", ".github/scripts/render_svg.py",
+            "--config", args.config,
+            "--gist-url", gist_url,
+            "--local-csv", history_csv,
+            "--out", svg_json]),
+        # 5) Fetch registry model version (best-effort)
+        subprocess.Popen(["python", ".github/scripts/fetch_registry_model.py",
+            "--config", args.config,
+            "--gist-url", gist_url,
+            "--local-csv", history_csv,
+            "--out", model_json]),
+    ]
 
-    # 5.5) List GitHub Actions artifacts for THIS run (metadata only)
-    run_id_env = os.environ.get("GITHUB_RUN_ID", "").strip()
-    gh_token = os.environ.get("GITHUB_TOKEN", "").strip()
+    try:
+        # 5.5) List GitHub Actions artifacts for THIS run (metadata only)
+        run_id_env = os.environ.get("GITHUB_RUN_ID", "").strip()
+        gh_token = os.environ.get("GITHUB_TOKEN", "").strip()
 
-    artifacts_payload = list_run_artifacts(repo, run_id_env, gh_token)
-    with open(artifacts_json, "w", encoding="utf-8") as f:
-        json.dump(artifacts_payload, f, indent=2)
+        artifacts_payload = list_run_artifacts(repo, run_id_env, gh_token)
+        with open(artifacts_json, "w", encoding="utf-8") as f:
+            json.dump(artifacts_payload, f, indent=2)
+    except BaseException:
+        # reap the children, but keep the artifact error as the one raised
+        for p in procs:
+            p.wait()
+        raise
+    wait_all(procs)
 
 
     # 6) Summary markdown (CSV-only for Sections 1 & 2)
     sh(["python", ".github/scripts/generate_summary_md.py",
         "--config", args.config,
         "--gist-url", gist_url,
+        "--local-csv", history_csv,
         "--svg-json", svg_json,
         "--model-json", model_json,
         "--devops-json", devops_json,